@@ -1,20 +1,171 @@
+import codecs
+import errno
+import functools
+import os
+import selectors
+import stat
 import subprocess
 import time
-import queue
 import threading
 
+from StreamIngest import IngestBuffer
+
+BACKEND_HOST = "root@172.16.16.111"
+PIPE_DIR = os.environ.get("LEGO_PIPE_DIR", "/root/LegoRobotOutputFile")
+NODE_DATA_PIPE = f"{PIPE_DIR}/backend_sending_node_data"
+COMMAND_PIPE = f"{PIPE_DIR}/frontend_sending_command"
+POINTS_PIPE = f"{PIPE_DIR}/frontend_sending_a_and_b"
+
+# All ssh calls share one multiplexed connection, so only the first one
+# pays for the handshake
+SSH_OPTIONS = [
+    "-o", "ControlMaster=auto",
+    "-o", "ControlPath=/tmp/lego-ssh-%r@%h:%p",
+    "-o", "ControlPersist=300",
+    "-o", "ConnectTimeout=5",
+]
+
+# 'local' opens the pipes directly, 'ssh' goes through BACKEND_HOST and
+# anything else picks local when the pipes exist on this machine
+TRANSPORT = os.environ.get("LEGO_TRANSPORT", "auto")
+READ_CHUNK_SIZE = 1 << 16
+
 stop_event = threading.Event()
 
-def read_pipe_forever(output_queue: queue.Queue):
-    ssh_command = [
-        "ssh",
-        "root@172.16.16.111",
-        "cat /root/LegoRobotOutputFile/backend_sending_node_data"
-    ]
+def ssh_command(remote_command):
+    """Build the ssh argument list for running a command on the backend"""
+    return ["ssh", *SSH_OPTIONS, BACKEND_HOST, remote_command]
+
+def is_fifo(path):
+    try:
+        return stat.S_ISFIFO(os.stat(path).st_mode)
+    except OSError:
+        return False
+
+@functools.lru_cache(maxsize=None)
+def use_local_transport():
+    """Whether the backend pipes are opened directly instead of over ssh"""
+    if TRANSPORT in ("local", "ssh"):
+        return TRANSPORT == "local"
+    return is_fifo(NODE_DATA_PIPE)
+
+def open_command_channel(timeout=10):
+    """Establish the shared ssh connection ahead of the first command"""
+    if use_local_transport():
+        print("[PIPE DEBUG] Using local pipes, no command channel needed")
+        return
+    subprocess.run(ssh_command("true"), check=True, timeout=timeout)
+    print("[PIPE DEBUG] Command channel ready")
 
+def pipe_exists(pipe, timeout=5):
+    """Check that one of the backend pipes has been created"""
+    if use_local_transport():
+        return is_fifo(pipe)
+    result = subprocess.run(ssh_command(f"[ -p {pipe} ] && echo exists || echo missing"),
+                            check=True, capture_output=True, text=True, timeout=timeout)
+    return "missing" not in result.stdout
+
+def same_fifo(fd, pipe):
+    """Whether fd still refers to the pipe at that path, the backend may
+    have removed and recreated it"""
+    try:
+        opened, current = os.fstat(fd), os.stat(pipe)
+    except OSError:
+        return False
+    return (opened.st_dev, opened.st_ino) == (current.st_dev, current.st_ino)
+
+def write_fifo(pipe, data, timeout=5):
+    """Write to a local pipe without spawning a process.
+
+    Like `echo > pipe`, this waits until the backend has the pipe open for
+    reading and raises subprocess.TimeoutExpired if it never does.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(pipe, os.O_WRONLY | os.O_NONBLOCK)
+            break
+        except OSError as e:
+            if e.errno != errno.ENXIO:
+                raise
+            if time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(f"write {pipe}", timeout)
+            time.sleep(0.05)
+    try:
+        os.write(fd, data.encode())
+    finally:
+        os.close(fd)
+
+def send_command(command, pipe=COMMAND_PIPE, timeout=5):
+    """Write a command line into one of the backend pipes"""
+    if use_local_transport():
+        write_fifo(pipe, f"{command}\n", timeout=timeout)
+        return
+    subprocess.run(ssh_command(f"echo '{command}' > {pipe}"), check=True, timeout=timeout)
+
+def read_fifo_forever(output_queue: IngestBuffer, pipe=NODE_DATA_PIPE):
+    """Read node data from a local pipe with non-blocking bulk reads"""
     while not stop_event.is_set():
+        fd = None
         try:
-            with subprocess.Popen(ssh_command, stdout=subprocess.PIPE, text=True) as proc:
+            fd = os.open(pipe, os.O_RDONLY | os.O_NONBLOCK)
+            # Holding a write end ourselves keeps the pipe from reporting
+            # EOF every time the backend closes and reopens it
+            keepalive_fd = os.open(pipe, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError as e:
+            print(f"[PIPE ERROR] {str(e)}")
+            if fd is not None:
+                os.close(fd)
+            time.sleep(1)
+            continue
+
+        selector = selectors.DefaultSelector()
+        selector.register(fd, selectors.EVENT_READ)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pending = ""
+        try:
+            while not stop_event.is_set():
+                if not selector.select(timeout=0.2):
+                    if not same_fifo(fd, pipe):
+                        print(f"[PIPE DEBUG] {pipe} was recreated, reopening")
+                        break
+                    continue
+                try:
+                    chunk = os.read(fd, READ_CHUNK_SIZE)
+                except BlockingIOError:
+                    continue
+                lines = (pending + decoder.decode(chunk)).split("\n")
+                pending = lines.pop()
+                for line in lines:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    output_queue.put(line)
+                    if line == 'x':
+                        stop_event.set()
+                        return
+                # The keepalive end means we never see EOF, so the 'x' sent
+                # with `echo -n x` has to be recognised without its newline
+                if pending.strip() == 'x':
+                    output_queue.put('x')
+                    stop_event.set()
+                    return
+        finally:
+            selector.close()
+            os.close(keepalive_fd)
+            os.close(fd)
+
+def read_pipe_forever(output_queue: IngestBuffer):
+    if use_local_transport():
+        print(f"[PIPE DEBUG] Reading local pipe {NODE_DATA_PIPE}")
+        read_fifo_forever(output_queue)
+        return
+
+    ssh_cmd = ssh_command(f"cat {NODE_DATA_PIPE}")
+
+    while not stop_event.is_set():
+        try:
+            with subprocess.Popen(ssh_cmd, stdout=subprocess.PIPE, text=True) as proc:
                 for line in proc.stdout:
                     line = line.strip()
                     if stop_event.is_set():
@@ -33,9 +184,13 @@ def read_pipe_forever(output_queue: queue.Queue):
 
 def write_x():
     print("[PIPE DEBUG] Sending termination signal 'x'")
-    ssh_command = [
-        "ssh",
-        "root@172.16.16.111",
-        "echo -n x > /root/LegoRobotOutputFile/backend_sending_node_data"
-    ]
-    subprocess.run(ssh_command)
\ No newline at end of file
+    if use_local_transport():
+        try:
+            write_fifo(NODE_DATA_PIPE, "x", timeout=1)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            print(f"[PIPE WARNING] Could not send 'x': {e}")
+        return
+    try:
+        subprocess.run(ssh_command(f"echo -n x > {NODE_DATA_PIPE}"), timeout=5)
+    except (subprocess.TimeoutExpired, OSError) as e:
+        print(f"[PIPE WARNING] Could not send 'x': {e}")
@@ -0,0 +1,320 @@
+import os
+import struct
+import sys
+import zlib
+from xml.sax.saxutils import escape
+
+from MapLayout import ROOT_ID, NODE_RADIUS, parent_of, layout_tree, trim_edge, grid_bounds, cell_color
+from NodeProtocol import NodeStreamDecoder
+from MazeGraph import MazeGraph
+
+TREE_WIDTH = 1000
+CELL_SIZE = 40
+PADDING = 50
+MAX_PNG_SIZE = 4096
+IO_CHUNK_SIZE = 1 << 16
+
+WHITE = b'\xff\xff\xff'
+BLACK = b'\x00\x00\x00'
+GRAY = b'\x80\x80\x80'
+RED = b'\xff\x00\x00'
+GREEN = b'\x00\x80\x00'
+LIGHTBLUE = b'\xad\xd8\xe6'
+ORANGE = b'\xff\xa5\x00'
+CELL_COLORS = {"red": RED, "orange": ORANGE, "lightblue": LIGHTBLUE}
+
+
+def export_map(path, view, edges, maze, current_node=None):
+    """Write the tree or labyrinth view to an .svg or .png file.
+
+    The labyrinth is drawn from the cells indexed by the MazeGraph and its
+    loop cross-edges are drawn in the tree view like on the canvas.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if view == 'tree':
+        writer = {'.svg': export_tree_svg, '.png': export_tree_png}.get(ext)
+        args = (path, edges, current_node, maze.cross_edges)
+    elif view == 'labyrinth':
+        writer = {'.svg': export_labyrinth_svg, '.png': export_labyrinth_png}.get(ext)
+        args = (path, maze.labyrinth_cells())
+    else:
+        raise ValueError(f"Unknown view: {view}")
+    if writer is None:
+        raise ValueError(f"Unsupported export format: {ext or path}")
+    writer(*args)
+    print(f"[INFO] Exported {view} view to {path}")
+
+
+def _tree_frame(edges, width):
+    """Lay the tree out and shift it so every node sits inside the padding"""
+    positions = layout_tree(edges, width)
+    min_x = min(x for x, y in positions.values()) - NODE_RADIUS - PADDING
+    min_y = min(y for x, y in positions.values()) - NODE_RADIUS - PADDING
+    max_x = max(x for x, y in positions.values()) + NODE_RADIUS + PADDING
+    max_y = max(y for x, y in positions.values()) + NODE_RADIUS + PADDING
+    positions = {node_id: (x - min_x, y - min_y) for node_id, (x, y) in positions.items()}
+    return positions, max_x - min_x, max_y - min_y
+
+
+def export_tree_svg(path, edges, current_node=None, cross_edges=(), width=TREE_WIDTH):
+    """Stream the tree view to an SVG file element by element"""
+    positions, svg_width, svg_height = _tree_frame(edges, width)
+
+    with open(path, 'w', encoding='utf-8', buffering=IO_CHUNK_SIZE) as out:
+        out.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{svg_width:.0f}" height="{svg_height:.0f}" '
+                  f'viewBox="0 0 {svg_width:.1f} {svg_height:.1f}">\n')
+        out.write('<rect width="100%" height="100%" fill="white"/>\n')
+
+        out.write('<g stroke="black" stroke-width="2">\n')
+        for parent_id, child_id in edges:
+            if parent_id in positions and child_id in positions:
+                x1, y1, x2, y2 = trim_edge(*positions[parent_id], *positions[child_id])
+                out.write(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}"/>\n')
+        out.write('</g>\n')
+
+        out.write('<g stroke="orange" stroke-width="2" stroke-dasharray="4 2">\n')
+        for node_a, node_b in cross_edges:
+            if node_a in positions and node_b in positions:
+                x1, y1, x2, y2 = trim_edge(*positions[node_a], *positions[node_b])
+                out.write(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}"/>\n')
+        out.write('</g>\n')
+
+        out.write('<g fill="lightblue" stroke="black">\n')
+        for node_id, (x, y) in positions.items():
+            fill = ' fill="green"' if node_id == current_node else ''
+            out.write(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{NODE_RADIUS}"{fill}/>\n')
+        out.write('</g>\n')
+
+        out.write('<g font-family="Arial" font-size="10" text-anchor="middle" dominant-baseline="central">\n')
+        for node_id, (x, y) in positions.items():
+            display_text = node_id.split('_')[-1] if node_id != ROOT_ID else "Rt"
+            out.write(f'<text x="{x:.1f}" y="{y:.1f}">{escape(display_text)}</text>\n')
+        out.write('</g>\n</svg>\n')
+
+
+def export_labyrinth_svg(path, visited, cell_size=CELL_SIZE):
+    """Stream the labyrinth grid to an SVG file.
+
+    visited maps each cell to its labels, as from MazeGraph.labyrinth_cells.
+    Unvisited cells are a single patterned background rectangle, so the
+    document only grows with the number of visited cells.
+    """
+    min_x, min_y, max_x, max_y = grid_bounds(visited)
+    svg_width = (max_x - min_x + 1) * cell_size
+    svg_height = (max_y - min_y + 1) * cell_size
+    half = cell_size / 2
+
+    with open(path, 'w', encoding='utf-8', buffering=IO_CHUNK_SIZE) as out:
+        out.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{svg_width}" height="{svg_height}">\n')
+        out.write(f'<defs><pattern id="cell" width="{cell_size}" height="{cell_size}" patternUnits="userSpaceOnUse">'
+                  f'<rect width="{cell_size}" height="{cell_size}" fill="gray" stroke="black"/></pattern></defs>\n')
+        out.write(f'<rect width="{svg_width}" height="{svg_height}" fill="url(#cell)"/>\n')
+
+        out.write('<g fill="lightblue" stroke="black">\n')
+        for (x, y), labels in visited.items():
+            color = cell_color(labels)
+            fill = f' fill="{color}"' if color != 'lightblue' else ''
+            out.write(f'<rect x="{(x - min_x) * cell_size}" y="{(y - min_y) * cell_size}" '
+                      f'width="{cell_size}" height="{cell_size}"{fill}/>\n')
+        out.write('</g>\n')
+
+        out.write('<g font-family="Arial" font-size="10" text-anchor="middle" dominant-baseline="central">\n')
+        for (x, y), labels in visited.items():
+            out.write(f'<text x="{(x - min_x) * cell_size + half}" y="{(y - min_y) * cell_size + half}">'
+                      f'{escape(labels[0])}</text>\n')
+        out.write('</g>\n</svg>\n')
+
+
+def _png_chunk(out, tag, data):
+    out.write(struct.pack('>I', len(data)))
+    out.write(tag)
+    out.write(data)
+    out.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(tag))))
+
+
+def _write_png(path, width, height, rows):
+    """Write an RGB PNG, compressing scanlines into IDAT chunks as they arrive"""
+    compressor = zlib.compressobj(6)
+    with open(path, 'wb') as out:
+        out.write(b'\x89PNG\r\n\x1a\n')
+        _png_chunk(out, b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        pending = []
+        pending_size = 0
+        for row in rows:
+            data = compressor.compress(b'\x00')
+            data += compressor.compress(row)
+            if data:
+                pending.append(data)
+                pending_size += len(data)
+            if pending_size >= IO_CHUNK_SIZE:
+                _png_chunk(out, b'IDAT', b''.join(pending))
+                pending, pending_size = [], 0
+        pending.append(compressor.flush())
+        _png_chunk(out, b'IDAT', b''.join(pending))
+        _png_chunk(out, b'IEND', b'')
+
+
+def _fill_disc(pixels, stride, width, height, cx, cy, radius, color):
+    r2 = radius * radius
+    for y in range(max(0, int(cy - radius)), min(height, int(cy + radius) + 1)):
+        dy = y - cy
+        half = (r2 - dy * dy) ** 0.5 if r2 >= dy * dy else -1
+        if half < 0:
+            continue
+        x1 = max(0, int(cx - half))
+        x2 = min(width - 1, int(cx + half))
+        if x2 >= x1:
+            pixels[y * stride + x1 * 3:y * stride + (x2 + 1) * 3] = color * (x2 - x1 + 1)
+
+
+def _draw_line(pixels, stride, width, height, x1, y1, x2, y2, color):
+    steps = int(max(abs(x2 - x1), abs(y2 - y1))) + 1
+    dx = (x2 - x1) / steps
+    dy = (y2 - y1) / steps
+    for i in range(steps + 1):
+        x = int(x1 + dx * i)
+        y = int(y1 + dy * i)
+        if 0 <= x < width and 0 <= y < height:
+            offset = y * stride + x * 3
+            pixels[offset:offset + 3] = color
+
+
+def _draw_elbow(pixels, stride, width, height, x1, y1, x2, y2, color):
+    """Draw a horizontal then a vertical segment from (x1, y1) to (x2, y2).
+
+    Both are written as slices instead of pixel by pixel, which keeps
+    thousands of long loop edges cheap.
+    """
+    x1, x2 = (min(max(int(x), 0), width - 1) for x in (x1, x2))
+    y1, y2 = (min(max(int(y), 0), height - 1) for y in (y1, y2))
+    left, right = min(x1, x2), max(x1, x2)
+    pixels[y1 * stride + left * 3:y1 * stride + (right + 1) * 3] = color * (right - left + 1)
+    top, bottom = min(y1, y2), max(y1, y2)
+    count = bottom - top + 1
+    start = top * stride + x2 * 3
+    for channel in range(3):
+        pixels[start + channel:start + channel + count * stride:stride] = color[channel:channel + 1] * count
+
+
+def export_tree_png(path, edges, current_node=None, cross_edges=(), width=TREE_WIDTH, max_size=MAX_PNG_SIZE):
+    """Rasterize the tree view to a PNG file without a display.
+
+    The drawing is scaled down to fit max_size. Node labels are left out
+    since there is no font renderer without Tk, and loop cross-edges are
+    drawn as right-angled connectors rather than straight lines.
+    """
+    positions, frame_width, frame_height = _tree_frame(edges, width)
+    scale = min(1.0, max_size / frame_width, max_size / frame_height)
+    img_width = max(1, int(frame_width * scale))
+    img_height = max(1, int(frame_height * scale))
+    stride = img_width * 3
+    pixels = bytearray(WHITE * (img_width * img_height))
+    positions = {node_id: (x * scale, y * scale) for node_id, (x, y) in positions.items()}
+
+    for parent_id, child_id in edges:
+        if parent_id in positions and child_id in positions:
+            x1, y1, x2, y2 = trim_edge(*positions[parent_id], *positions[child_id], NODE_RADIUS * scale)
+            _draw_line(pixels, stride, img_width, img_height, x1, y1, x2, y2, BLACK)
+
+    for node_a, node_b in cross_edges:
+        if node_a in positions and node_b in positions:
+            # The node discs drawn next cover the ends
+            _draw_elbow(pixels, stride, img_width, img_height, *positions[node_a], *positions[node_b], ORANGE)
+
+    radius = NODE_RADIUS * scale
+    for node_id, (x, y) in positions.items():
+        color = GREEN if node_id == current_node else LIGHTBLUE
+        if radius >= 2:
+            _fill_disc(pixels, stride, img_width, img_height, x, y, radius, BLACK)
+            _fill_disc(pixels, stride, img_width, img_height, x, y, radius - 1, color)
+        else:
+            _fill_disc(pixels, stride, img_width, img_height, x, y, max(radius, 0.5), color)
+
+    view = memoryview(pixels)
+    _write_png(path, img_width, img_height, (view[y * stride:(y + 1) * stride] for y in range(img_height)))
+
+
+def export_labyrinth_png(path, visited, cell_size=CELL_SIZE, max_size=MAX_PNG_SIZE):
+    """Rasterize the labyrinth grid to a PNG file one cell row at a time"""
+    min_x, min_y, max_x, max_y = grid_bounds(visited)
+    grid_width = max_x - min_x + 1
+    grid_height = max_y - min_y + 1
+    cell_size = max(2, min(cell_size, max_size // max(grid_width, grid_height)))
+    img_width = grid_width * cell_size + 1
+    img_height = grid_height * cell_size + 1
+
+    cells_by_row = {}
+    for (x, y), labels in visited.items():
+        cells_by_row.setdefault(y, []).append((x, CELL_COLORS[cell_color(labels)]))
+
+    border_row = BLACK * img_width
+    empty_row = (BLACK + GRAY * (cell_size - 1)) * grid_width + BLACK
+
+    def rows():
+        for y in range(min_y, max_y + 1):
+            yield border_row
+            row = empty_row
+            if y in cells_by_row:
+                row = bytearray(empty_row)
+                for x, color in cells_by_row[y]:
+                    offset = ((x - min_x) * cell_size + 1) * 3
+                    row[offset:offset + (cell_size - 1) * 3] = color * (cell_size - 1)
+            for _ in range(cell_size - 1):
+                yield row
+        yield border_row
+
+    _write_png(path, img_width, img_height, rows())
+
+
+def load_recording(path):
+    """Rebuild nodes, edges and the maze graph from a recorded robot output file"""
+    nodes = {}
+    edges = []
+    seen_edges = set()
+    current_node = None
+    decoder = NodeStreamDecoder()
+    maze = MazeGraph()
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line == 'x':
+                continue
+            try:
+                messages = decoder.decode(line)
+            except ValueError:
+                continue
+            for data in messages:
+                node_id = data.get("node_id") if isinstance(data, dict) else None
+                if not node_id or not isinstance(node_id, str):
+                    continue
+                current_node = node_id
+                parent_id = parent_of(node_id)
+                if node_id not in nodes:
+                    nodes[node_id] = {"parent": parent_id}
+                if parent_id and (parent_id, node_id) not in seen_edges:
+                    seen_edges.add((parent_id, node_id))
+                    edges.append((parent_id, node_id))
+                maze.add_node(node_id, data.get("distance"))
+    print(f"[INFO] {len(maze.cross_edges)} loops found in {path}")
+    return nodes, edges, maze, current_node
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export a recorded robot run as SVG or PNG")
+    parser.add_argument("recording", help="file with one JSON node message per line")
+    parser.add_argument("output", help="output file ending in .svg or .png")
+    parser.add_argument("--view", choices=["tree", "labyrinth"], default="tree")
+    args = parser.parse_args(argv)
+
+    nodes, edges, maze, current_node = load_recording(args.recording)
+    if not nodes:
+        print(f"[ERROR] No nodes found in {args.recording}")
+        return 1
+    export_map(args.output, args.view, edges, maze, current_node)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+from collections import deque
+
+ROOT_ID = "Rt_"
+NODE_RADIUS = 15
+VERTICAL_SPACING = 100
+ROOT_Y = 50
+
+# Movement directions (N=0, E=1, S=2, W=3)
+DIRECTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+START_DIRECTION = 2  # Initial direction (South)
+
+
+def parent_of(node_id):
+    """Return the parent id of a node path, or None for the root"""
+    if node_id == ROOT_ID:
+        return None
+    parent_id = node_id[:-1]
+    if parent_id == "Rt" and node_id.startswith(ROOT_ID):
+        parent_id = ROOT_ID
+    return parent_id
+
+
+def layout_tree(edges, width, root_y=ROOT_Y):
+    """Compute (x, y) positions for every node reachable from the root.
+
+    This is the layout used by the tree view: children fan out below their
+    parent, L to the left, F straight down and R to the right, and the
+    horizontal spread shrinks by 0.6 per level.
+    """
+    children = {}
+    for parent_id, child_id in edges:
+        children.setdefault(parent_id, []).append(child_id)
+
+    root_x = width / 2
+    positions = {ROOT_ID: (root_x, root_y)}
+    pending = deque([(ROOT_ID, root_x, root_y, width)])
+
+    while pending:
+        node_id, parent_x, parent_y, node_width = pending.popleft()
+        kids = children.get(node_id)
+        if not kids:
+            continue
+
+        child_y = parent_y + VERTICAL_SPACING
+        directions = [child_id[-1] for child_id in kids]
+        f_count, l_count, r_count = directions.count('F'), directions.count('L'), directions.count('R')
+        total_directions = max(1, f_count + l_count + r_count)
+        section_width = node_width / total_directions
+        horizontal_spread = node_width / 6
+        l_index, r_index = 0, l_count + f_count
+
+        for child_id, direction in zip(kids, directions):
+            if direction == 'L':
+                child_x = parent_x - horizontal_spread + l_index * section_width
+                l_index += 1
+            elif direction == 'R':
+                child_x = parent_x + horizontal_spread - (total_directions - r_index - 1) * section_width
+                r_index += 1
+            else:
+                child_x = parent_x
+            positions[child_id] = (child_x, child_y)
+            pending.append((child_id, child_x, child_y, node_width * 0.6))
+
+    return positions
+
+
+def trim_edge(x1, y1, x2, y2, shorten_by=NODE_RADIUS):
+    """Shorten a parent-child segment so it stops at the node circles"""
+    dx, dy = x2 - x1, y2 - y1
+    length = (dx**2 + dy**2)**0.5
+    if length > 2 * shorten_by:
+        x1 += dx * shorten_by / length
+        y1 += dy * shorten_by / length
+        x2 -= dx * shorten_by / length
+        y2 -= dy * shorten_by / length
+    return x1, y1, x2, y2
+
+
+def step_pose(pose, move):
+    """Apply one move character to a (x, y, direction) pose"""
+    x, y, heading = pose
+    if move == 'R':
+        heading = (heading + 1) % 4  # Turn right first
+    elif move == 'L':
+        heading = (heading - 1) % 4  # Turn left first
+    elif move != 'F':
+        return pose
+    dx, dy = DIRECTIONS[heading]
+    return x + dx, y + dy, heading
+
+
+def cell_color(labels):
+    """Fill color of a labyrinth cell, orange when it was reached twice"""
+    if labels[0] == 'Start':
+        return "red"
+    return "orange" if len(labels) > 1 else "lightblue"
+
+
+def grid_bounds(cells):
+    """Return (min_x, min_y, max_x, max_y) of the cells with one cell of padding"""
+    all_x = [x for x, y in cells]
+    all_y = [y for x, y in cells]
+    return min(all_x) - 1, min(all_y) - 1, max(all_x) + 1, max(all_y) + 1
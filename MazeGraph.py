@@ -0,0 +1,130 @@
+import heapq
+
+from MapLayout import ROOT_ID, START_DIRECTION, parent_of, step_pose
+
+
+class MazeGraph:
+    """Explored maze as a graph, built up one node at a time.
+
+    Every node is placed on the grid and a spatial index maps each cell to
+    the nodes that reached it, which is what the labyrinth view draws.
+    When a node lands on a cell an earlier node already occupies, the robot
+    has come back to a known place through a loop, so the two nodes get a
+    zero-weight cross-edge and the tree becomes a graph.
+
+    Tree edges are weighted by the difference in reported distance between
+    parent and child, or 1 when either distance is unknown.
+    """
+
+    def __init__(self):
+        self.poses = {ROOT_ID: (0, 0, START_DIRECTION)}
+        self.cells = {(0, 0): [ROOT_ID]}
+        self.distances = {}
+        self.neighbors = {ROOT_ID: {}}
+        self.parent_weights = {}
+        self.cross_edges = []
+
+    def add_node(self, node_id, distance=None):
+        """Index a node, returns the earlier node whose cell it revisits"""
+        if node_id in self.poses:
+            if distance is not None:
+                self.distances.setdefault(node_id, distance)
+            return None
+
+        # Index missing ancestors first so every pose comes from its parent
+        missing = []
+        ancestor = node_id
+        while ancestor not in self.poses:
+            if not ancestor:
+                return None
+            missing.append(ancestor)
+            ancestor = parent_of(ancestor)
+
+        revisited = None
+        for ancestor in reversed(missing):
+            revisited = self._index(ancestor, distance if ancestor == node_id else None)
+        return revisited
+
+    def _index(self, node_id, distance):
+        parent_id = parent_of(node_id)
+        pose = step_pose(self.poses[parent_id], node_id[-1])
+        self.poses[node_id] = pose
+        self.neighbors[node_id] = {}
+        if distance is not None:
+            self.distances[node_id] = distance
+
+        weight = self._weight(parent_id, node_id)
+        self.parent_weights[node_id] = weight
+        self._link(parent_id, node_id, weight)
+
+        occupants = self.cells.setdefault(pose[:2], [])
+        revisited = None
+        # Linking to the first occupant is enough to connect the whole cell
+        if occupants and parent_id not in occupants:
+            revisited = occupants[0]
+            self._link(revisited, node_id, 0)
+            self.cross_edges.append((revisited, node_id))
+        occupants.append(node_id)
+        return revisited
+
+    def labyrinth_cells(self):
+        """Return each visited cell with the labels of the nodes that
+        reached it, earliest first, the root being labelled 'Start'"""
+        return {cell: [node_id.split('_')[-1] if node_id != ROOT_ID else 'Start' for node_id in occupants]
+                for cell, occupants in self.cells.items()}
+
+    def _weight(self, parent_id, node_id):
+        parent_distance = self.distances.get(parent_id)
+        distance = self.distances.get(node_id)
+        if isinstance(parent_distance, (int, float)) and isinstance(distance, (int, float)):
+            return abs(distance - parent_distance)
+        return 1
+
+    def _link(self, a, b, weight):
+        self.neighbors[a][b] = weight
+        self.neighbors[b][a] = weight
+
+    def shortest_route(self, start, end):
+        """Return (cost, node path) of the cheapest route, or (None, [])"""
+        if start not in self.neighbors or end not in self.neighbors:
+            return None, []
+
+        best = {start: 0}
+        previous = {}
+        pending = [(0, start)]
+        while pending:
+            cost, node_id = heapq.heappop(pending)
+            if node_id == end:
+                path = [end]
+                while path[-1] != start:
+                    path.append(previous[path[-1]])
+                return cost, path[::-1]
+            if cost > best[node_id]:
+                continue
+            for neighbor, weight in self.neighbors[node_id].items():
+                new_cost = cost + weight
+                if new_cost < best.get(neighbor, float('inf')):
+                    best[neighbor] = new_cost
+                    previous[neighbor] = node_id
+                    heapq.heappush(pending, (new_cost, neighbor))
+        return None, []
+
+    def tree_route_cost(self, start, end):
+        """Cost of going from start to end through the tree only"""
+        if start not in self.poses or end not in self.poses:
+            return None
+
+        start_costs = {}
+        cost = 0
+        node_id = start
+        while node_id is not None:
+            start_costs[node_id] = cost
+            cost += self.parent_weights.get(node_id, 0)
+            node_id = parent_of(node_id)
+
+        cost = 0
+        node_id = end
+        while node_id not in start_costs:
+            cost += self.parent_weights.get(node_id, 0)
+            node_id = parent_of(node_id)
+        return cost + start_costs[node_id]
@@ -0,0 +1,157 @@
+"""Node stream protocol between the robot backend and the frontend.
+
+Older backends send one JSON object per line with the full node path:
+
+    {"node_id": "Rt_FL", "distance": 20, "current_direction": "N"}
+
+A backend that sends deltas first announces it on the node data pipe with
+a hello line, which is the only signal the frontend needs:
+
+    {"protocol": "delta", "version": 1}
+
+Delta frames that arrive before the hello are rejected. From then on every
+node gets an index in the order it is first sent, the root "Rt_" being 0. A frame packs several updates, each one being
+[parent_index, move, distance, current_direction]. With a move the update
+is the child of parent_index reached by that move, without one it is the
+node at that index itself (the robot went back to a known node). Frames
+come either as JSON or, to skip json.loads entirely, as a compact line
+with ';' between updates and ',' between fields:
+
+    {"d": [[0, "F", 10, "S"], [1, "L", 20, "E"], [1, "", 10, "N"]]}
+    ~0,F,10,S;1,L,20,E;1,,10,N
+
+Trailing fields may be left out. Other JSON lines (e.g. the
+finishedLabyrinth message) pass through unchanged in both modes.
+"""
+import json
+
+from MapLayout import ROOT_ID, parent_of
+
+PROTOCOL_VERSION = 1
+COMPACT_PREFIX = '~'
+
+
+class NodeStreamDecoder:
+    """Turn received lines into full node messages"""
+
+    def __init__(self):
+        self.delta_mode = False
+        self.reset()
+
+    def reset(self):
+        self.node_ids = [ROOT_ID]
+        self.node_index = {ROOT_ID: 0}
+
+    def register(self, node_id):
+        if node_id not in self.node_index:
+            self.node_index[node_id] = len(self.node_ids)
+            self.node_ids.append(node_id)
+
+    def decode(self, line):
+        """Return the list of messages carried by one line.
+
+        Raises ValueError (json.JSONDecodeError for plain text) for lines
+        that are not part of the protocol or malformed delta frames.
+        """
+        if line.startswith(COMPACT_PREFIX):
+            if not self.delta_mode:
+                raise ValueError("Delta frame received before the delta hello")
+            return self.decode_updates(
+                [record.split(',') for record in line[1:].split(';') if record])
+
+        data = json.loads(line)
+        if not isinstance(data, dict):
+            return [data]
+        if data.get("protocol") == "delta":
+            print(f"[INFO] Backend switched to delta protocol v{data.get('version', PROTOCOL_VERSION)}")
+            self.delta_mode = True
+            self.reset()
+            return []
+        if "d" in data:
+            if not self.delta_mode:
+                raise ValueError("Delta frame received before the delta hello")
+            return self.decode_updates(data["d"])
+        if isinstance(data.get("node_id"), str):
+            self.register(data["node_id"])
+        return [data]
+
+    def decode_updates(self, updates):
+        """Rebuild full node messages from a batch of delta updates.
+
+        Raises ValueError for a malformed update or an unknown node index.
+        """
+        if not isinstance(updates, list):
+            raise ValueError(f"Delta updates must be a list, got {updates!r}")
+
+        # Nodes are only registered once the whole batch decoded, so a bad
+        # update leaves the index as it was
+        messages = []
+        new_ids = []
+        new_index = {}
+        known = len(self.node_ids)
+        for update in updates:
+            if not isinstance(update, list) or not update:
+                raise ValueError(f"Malformed delta update: {update!r}")
+            index = update[0]
+            if isinstance(index, str):
+                index = int(index)
+            if isinstance(index, bool) or not isinstance(index, int) or not 0 <= index < known + len(new_ids):
+                raise ValueError(f"Unknown node index in delta update: {update!r}")
+            move = update[1] if len(update) > 1 else None
+            if move is not None and not isinstance(move, str):
+                raise ValueError(f"Malformed move in delta update: {update!r}")
+
+            node_id = self.node_ids[index] if index < known else new_ids[index - known]
+            if move:
+                node_id += move
+                if node_id not in self.node_index and node_id not in new_index:
+                    new_index[node_id] = len(new_ids)
+                    new_ids.append(node_id)
+            data = {"node_id": node_id}
+            if len(update) > 2 and update[2] not in (None, ''):
+                data["distance"] = _number(update[2])
+            if len(update) > 3 and update[3]:
+                data["current_direction"] = update[3]
+            messages.append(data)
+
+        for node_id in new_ids:
+            self.register(node_id)
+        return messages
+
+
+class NodeStreamEncoder:
+    """Backend side of the delta protocol, used by the mock robot"""
+
+    def __init__(self, compact=True):
+        self.compact = compact
+        self.node_index = {ROOT_ID: 0}
+
+    def hello(self):
+        return json.dumps({"protocol": "delta", "version": PROTOCOL_VERSION})
+
+    def encode(self, messages):
+        """Pack full node messages into one frame line"""
+        updates = []
+        for data in messages:
+            node_id = data["node_id"]
+            if node_id in self.node_index:
+                update = [self.node_index[node_id], '']
+            else:
+                update = [self.node_index[parent_of(node_id)], node_id[-1]]
+                self.node_index[node_id] = len(self.node_index)
+            update.append(data.get("distance", ''))
+            update.append(data.get("current_direction", ''))
+            updates.append(update)
+
+        if not self.compact:
+            return json.dumps({"d": updates}, separators=(',', ':'))
+        return COMPACT_PREFIX + ';'.join(','.join(str(field) for field in update) for update in updates)
+
+
+def _number(value):
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return float(value)
+    return value
@@ -0,0 +1,90 @@
+import threading
+
+from NodeProtocol import NodeStreamDecoder
+
+MAX_PENDING_EVENTS = 10000
+
+
+class IngestBuffer:
+    """Hand-off between the pipe reader thread and the Tk loop.
+
+    Lines are decoded on the reader thread. Structural events (a node seen
+    for the first time, the completion message, the 'x' stop signal) are
+    kept in order and never dropped. Everything else only updates the
+    status shown in the side panel, so just the latest one is kept and a
+    backlog after a stall collapses into a single update.
+
+    The reader takes the place of a queue.Queue, so it only needs put().
+    When MAX_PENDING_EVENTS structural events are waiting, put() blocks
+    until the UI drains them, which pushes back on the pipe instead of
+    growing memory. Setting stop_event or calling close() releases it.
+    """
+
+    def __init__(self, max_events=MAX_PENDING_EVENTS, stop_event=None):
+        self.decoder = NodeStreamDecoder()
+        self.stop_event = stop_event if stop_event is not None else threading.Event()
+        self.known_nodes = set()
+        self.max_events = max_events
+        self.events = []
+        self.status = None
+        self.closed = False
+        self.lock = threading.Lock()
+        self.not_full = threading.Condition(self.lock)
+
+    def put(self, line):
+        """Decode one line from the pipe, called from the reader thread.
+
+        Never raises for a bad line, it is shown as a plain message instead.
+        """
+        events = []
+        status = None
+        if line == 'x':
+            events.append(('stop', None))
+        else:
+            try:
+                messages = self.decoder.decode(line)
+            except ValueError:
+                messages = [line]
+            except Exception as e:
+                print(f"[PIPE WARNING] Could not decode {line!r}: {e}")
+                messages = [line]
+
+            for data in messages:
+                if not isinstance(data, dict):
+                    status = ('text', line)
+                    continue
+                if data.get("finishedLabyrinth") == "true":
+                    events.append(('finished', None))
+                    continue
+                node_id = data.get("node_id")
+                if node_id and node_id not in self.known_nodes:
+                    self.known_nodes.add(node_id)
+                    events.append(('node', data))
+                status = ('data', data)
+
+        with self.not_full:
+            while (events and len(self.events) >= self.max_events
+                   and not self.closed and not self.stop_event.is_set()):
+                self.not_full.wait(timeout=0.2)
+            self.events.extend(events)
+            if status is not None:
+                self.status = status
+
+    def drain(self):
+        """Return (events, status) received since the last drain.
+
+        events is the ordered list of (kind, payload) structural events,
+        the payload of 'node' events being the node message. status is the
+        latest ('data', message) or ('text', line), or None.
+        """
+        with self.not_full:
+            events, self.events = self.events, []
+            status, self.status = self.status, None
+            self.not_full.notify_all()
+        return events, status
+
+    def close(self):
+        """Release a reader blocked on a full buffer"""
+        with self.not_full:
+            self.closed = True
+            self.not_full.notify_all()
@@ -1,38 +1,113 @@
-import json
+import time
 import tkinter as tk
 from tkinter import ttk
-import queue
 import threading
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import messagebox
-from FileProcessor import read_pipe_forever, write_x, stop_event
+from tkinter import filedialog
+from FileProcessor import (read_pipe_forever, write_x, stop_event, send_command, pipe_exists,
+                           open_command_channel, COMMAND_PIPE, POINTS_PIPE)
+from MapLayout import parent_of, layout_tree, trim_edge, grid_bounds, cell_color
+from MapExporter import export_map
+from StreamIngest import IngestBuffer
+from MazeGraph import MazeGraph
 
 class LabyrinthVisualizer:
-    def __init__(self, root, mode='auto'):
+    def __init__(self, root, mode=None, started_at=None):
         print("[DEBUG] Visualizer starting up")
         self.root = root
         self.root.title("Labyrinth Robot Path Visualizer")
-        self.mode = mode  # 'auto' or 'manual'
-        
-        # Initialize UI based on mode
-        self.setup_ui()
+        self.mode = mode  # 'auto', 'manual' or None to ask in the window
+        self.started_at = started_at if started_at is not None else time.perf_counter()
         
         # --- State setup ---
         self.nodes = {}
         self.edges = []
+        self.edge_set = set()
+        self.maze = MazeGraph()
+        self.tree_dirty = False
         self.current_node = None
+        self.current_view = 'tree'
         self.zoom_level = 1.0
-        self.data_queue = queue.Queue()
-
-        if self.mode == 'auto':
-            self.canvas.bind("<MouseWheel>", self.zoom_handler)
-            self.canvas.bind("<Button-4>", self.zoom_handler)
-            self.canvas.bind("<Button-5>", self.zoom_handler)
-            self.canvas.bind("<Configure>", lambda e: self.canvas.focus_set())
+        self.ingest = IngestBuffer(stop_event=stop_event)
+        self.first_node_seen = False
+        self.keep_running = True
 
-        # Start the data stream
+        # Connect both backend channels in the background while the UI is built
+        self.command_executor = ThreadPoolExecutor(max_workers=2)
+        self.command_executor.submit(self.open_command_channel)
         self.start_data_stream()
-        self.keep_running = True
+
+        # Initialize UI based on mode
+        if self.mode is None:
+            self.show_mode_chooser()
+        else:
+            self.setup_ui()
+            self.root.after(100, self.process_queue)
+        self.root.after_idle(self.report_first_frame)
+
+    def open_command_channel(self):
+        """Warm up the command connection, runs on the executor"""
+        try:
+            open_command_channel()
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            print(f"[PIPE WARNING] Could not pre-open command channel: {e}")
+
+    def report_first_frame(self):
+        print(f"[TIMING] First frame after {time.perf_counter() - self.started_at:.3f}s")
+
+    def show_mode_chooser(self):
+        """Ask for the operation mode inside the main window"""
+        self.chooser_frame = ttk.Frame(self.root, padding=20)
+        self.chooser_frame.pack(expand=True)
+
+        ttk.Label(self.chooser_frame, text="Choose robot operation mode:",
+                font=('Arial', 12, 'bold')).pack(pady=10)
+
+        button_frame = ttk.Frame(self.chooser_frame)
+        button_frame.pack(pady=5)
+        self.auto_mode_button = ttk.Button(button_frame, text="Auto Mode",
+                                        command=lambda: self.choose_mode('auto'))
+        self.auto_mode_button.pack(side=tk.LEFT, padx=5)
+        self.manual_mode_button = ttk.Button(button_frame, text="Manual Mode",
+                                          command=lambda: self.choose_mode('manual'))
+        self.manual_mode_button.pack(side=tk.LEFT, padx=5)
+
+        self.chooser_status = ttk.Label(self.chooser_frame, text="")
+        self.chooser_status.pack(pady=5)
+
+    def choose_mode(self, mode):
+        """Send the chosen mode to the backend without blocking the UI"""
+        self.auto_mode_button.state(['disabled'])
+        self.manual_mode_button.state(['disabled'])
+        self.chooser_status.config(text="Sending mode to backend...")
+
+        command = 'a' if mode == 'auto' else 'm'
+        future = self.command_executor.submit(send_command, command)
+        self.root.after(50, self.wait_for_mode, mode, command, future)
+
+    def wait_for_mode(self, mode, command, future):
+        """Poll the mode command and build the mode UI once it was sent"""
+        if not future.done():
+            self.root.after(50, self.wait_for_mode, mode, command, future)
+            return
+
+        try:
+            future.result()
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
+            print(f"[ERROR] Failed to send mode command: {e}")
+            messagebox.showerror("Error", f"Failed to initialize mode: {e}")
+            stop_event.set()
+            self.command_executor.shutdown(wait=False)
+            self.root.destroy()
+            return
+
+        print(f"[INFO] Successfully sent '{command}' to backend")
+        self.chooser_frame.destroy()
+        self.mode = mode
+        self.setup_ui()
+        self.root.after(100, self.process_queue)
 
     def setup_ui(self):
         """Setup UI based on current mode"""
@@ -83,6 +158,11 @@ class LabyrinthVisualizer:
         self.left_frame.grid_rowconfigure(0, weight=1)
         self.left_frame.grid_columnconfigure(0, weight=1)
 
+        self.canvas.bind("<MouseWheel>", self.zoom_handler)
+        self.canvas.bind("<Button-4>", self.zoom_handler)
+        self.canvas.bind("<Button-5>", self.zoom_handler)
+        self.canvas.bind("<Configure>", lambda e: self.canvas.focus_set())
+
         # Legend for auto mode
         ttk.Label(self.right_frame, text="Legend", font=('Arial', 10, 'bold')).pack(pady=(20,5), anchor='w')
         legend_frame = ttk.Frame(self.right_frame)
@@ -112,6 +192,10 @@ class LabyrinthVisualizer:
                                     command=self.show_part_path)
         self.part_button.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=2)
 
+        self.export_button = ttk.Button(self.right_frame, text="Export Map...",
+                                      command=self.export_current_view)
+        self.export_button.pack(fill=tk.X, padx=7, pady=5)
+
     def setup_manual_ui(self):
         """Setup UI for manual mode"""
         # Remove canvas if it exists (from previous auto mode)
@@ -175,13 +259,7 @@ class LabyrinthVisualizer:
         """Switch from manual to auto mode"""
         try:
             # Send 'a' command to backend
-            fifo_path = '/root/LegoRobotOutputFile/frontend_sending_command'
-            ssh_command = [
-                "ssh",
-                "root@172.16.16.111",
-                f"echo 'a' > {fifo_path}"
-            ]
-            subprocess.run(ssh_command, check=True, timeout=5)
+            send_command('a')
             print("[INFO] Sent 'a' command to switch to auto mode")
             
             # Clear current UI
@@ -193,22 +271,16 @@ class LabyrinthVisualizer:
             self.setup_ui()
             self.draw_tree()  # Initial draw if needed
             
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, OSError) as e:
             print(f"[ERROR] Failed to switch to auto mode: {e}")
             messagebox.showerror("Error", f"Failed to switch to auto mode: {e}")
 
     def send_manual_command(self, command):
         """Send manual movement command to backend"""
         try:
-            fifo_path = '/root/LegoRobotOutputFile/frontend_sending_command'
-            ssh_command = [
-                "ssh",
-                "root@172.16.16.111",
-                f"echo '{command}' > {fifo_path}"
-            ]
-            subprocess.run(ssh_command, check=True, timeout=5)
+            send_command(command)
             print(f"[INFO] Sent manual command: {command}")
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, OSError) as e:
             print(f"[ERROR] Failed to send manual command: {e}")
             messagebox.showerror("Error", f"Failed to send command: {e}")
 
@@ -217,43 +289,34 @@ class LabyrinthVisualizer:
         print("[PIPE DEBUG] Starting data stream thread")
         self.reader_thread = threading.Thread(
             target=read_pipe_forever,
-            args=(self.data_queue,),
+            args=(self.ingest,),
             daemon=True
         )
         self.reader_thread.start()
-        self.root.after(100, self.process_queue)
 
     def process_queue(self):
-        """Process messages from the queue"""
-        try:
-            while not self.data_queue.empty():
-                line = self.data_queue.get_nowait()
-                print(f"[RAW RECEIVED] {line}")
-                
-                if line == 'x':
-                    print("Received stop signal")
-                    self.on_close()
-                    return
-                
-                try:
-                    print(f"[DEBUG] Attempting to parse: {repr(line)}")
-                    data = json.loads(line)
-                    print(f"[DEBUG] Parsed JSON: {data}")
-                    # Check for finished labyrinth message
-                    if data.get("finishedLabyrinth") == "true":
-                        print("[INFO] Received labyrinth completion signal")
-                        self.handle_labyrinth_completion()
-                        continue
-                    self.process_data(data)
-                except json.JSONDecodeError:
-                    print(f"[INFO] Plain message received: {line}")
-                    self.node_label.config(text=f"Message: {line}")
-                except Exception as e:
-                    print(f"[CRITICAL] Unexpected error: {str(e)}")
-                    raise
-
-        except queue.Empty:
-            pass
+        """Apply everything the reader buffered since the last poll"""
+        events, status = self.ingest.drain()
+
+        for kind, payload in events:
+            if kind == 'stop':
+                print("Received stop signal")
+                self.on_close()
+                return
+            if kind == 'finished':
+                print("[INFO] Received labyrinth completion signal")
+                self.flush_tree()
+                self.show_status(status)
+                status = None
+                self.handle_labyrinth_completion()
+            elif kind == 'node':
+                self.add_node(payload)
+
+        # Only the latest status matters, older ones were already conflated
+        self.show_status(status)
+        # Redraw once for everything that arrived since the last poll
+        self.flush_tree()
+        self.root.update_idletasks()
 
         if not stop_event.is_set():
             self.root.after(100, self.process_queue)
@@ -268,26 +331,44 @@ class LabyrinthVisualizer:
         # Show completion message
         messagebox.showinfo("Mapping Complete", "The robot has finished mapping the labyrinth")
 
-    def process_data(self, data):
-        print(f"[DEBUG] Processing node data: {data}")
-        
+    def add_node(self, data):
+        """Add a newly discovered node to the tree model and maze graph"""
+        node_id = data["node_id"]
+        print(f"[DEBUG] Adding node: {node_id}")
+        if not self.first_node_seen:
+            self.first_node_seen = True
+            print(f"[TIMING] First node after {time.perf_counter() - self.started_at:.3f}s")
+
+        parent_id = parent_of(node_id)
+
+        if node_id not in self.nodes:
+            self.nodes[node_id] = {"parent": parent_id}
+
+        # Only add edge and redraw if this is a new edge
+        if parent_id and (parent_id, node_id) not in self.edge_set:
+            self.edge_set.add((parent_id, node_id))
+            self.edges.append((parent_id, node_id))
+            self.tree_dirty = True
+
+        revisited = self.maze.add_node(node_id, data.get("distance"))
+        if revisited:
+            print(f"[DEBUG] Loop detected: {node_id} revisits the cell of {revisited}")
+            self.tree_dirty = True
+
+    def show_status(self, status):
+        """Show the latest robot status in the side panel"""
+        if status is None:
+            return
+        kind, data = status
+        if kind == 'text':
+            print(f"[INFO] Plain message received: {data}")
+            self.node_label.config(text=f"Message: {data}")
+            return
+
         node_id = data.get("node_id")
         if node_id:
             self.node_label.config(text=f"Current Node: {node_id}")
             self.current_node = node_id
-
-            parent_id = node_id[:-1] if node_id != "Rt_" else None
-            if parent_id == "Rt" and node_id.startswith("Rt_"):
-                parent_id = "Rt_"
-
-            if node_id not in self.nodes:
-                self.nodes[node_id] = {"parent": parent_id}
-
-            # Only add edge and redraw if this is a new edge
-            if parent_id and (parent_id, node_id) not in self.edges:
-                self.edges.append((parent_id, node_id))
-                self.draw_tree()
-
         else:
             self.node_label.config(text="Node: unknown")
 
@@ -299,8 +380,14 @@ class LabyrinthVisualizer:
         else:
             self.distance_label.config(text="Distance: -")
 
-        self.root.update_idletasks()
-
+    def flush_tree(self):
+        """Redraw the active view if nodes were added since the last draw"""
+        if self.tree_dirty and hasattr(self, 'canvas'):
+            self.tree_dirty = False
+            if self.current_view == 'labyrinth':
+                self.draw_labyrinth()
+            else:
+                self.draw_tree()
 
     def zoom_handler(self, event):
         """Handle mouse wheel zooming"""
@@ -332,60 +419,24 @@ class LabyrinthVisualizer:
         print(f"[DEBUG] All edges: {self.edges}")
 
         """Draw the tree visualization"""
+        self.current_view = 'tree'
         self.canvas.delete("all")
         if not self.nodes:
             return
 
-        node_positions = {}
-        canvas_width = self.canvas.winfo_width()
-        canvas_height = self.canvas.winfo_height()
-        root_x, root_y = canvas_width / 2, 50
-        node_positions["Rt_"] = (root_x, root_y)
-        queue = [("Rt_", root_x, root_y, canvas_width)]
-        vertical_spacing = 100
-
-        while queue:
-            node_id, parent_x, parent_y, width = queue.pop(0)
-            children = [child for (parent, child) in self.edges if parent == node_id]
-            if not children:
-                continue
-
-            child_y = parent_y + vertical_spacing
-            directions = [child_id[-1] for child_id in children]
-            f_count, l_count, r_count = directions.count('F'), directions.count('L'), directions.count('R')
-            total_directions = max(1, f_count + l_count + r_count)
-            section_width = width / total_directions
-            horizontal_spread = width / 6
-            f_index, l_index, r_index = l_count, 0, l_count + f_count
-
-            for child_id in children:
-                direction = child_id[-1]
-                if direction == 'F':
-                    child_x = parent_x
-                elif direction == 'L':
-                    child_x = parent_x - horizontal_spread + l_index * section_width
-                    l_index += 1
-                elif direction == 'R':
-                    child_x = parent_x + horizontal_spread - (total_directions - r_index - 1) * section_width
-                    r_index += 1
-                node_positions[child_id] = (child_x, child_y)
-                queue.append((child_id, child_x, child_y, width * 0.6))
+        node_positions = layout_tree(self.edges, self.canvas.winfo_width())
 
         for parent_id, child_id in self.edges:
             if parent_id in node_positions and child_id in node_positions:
-                x1, y1 = node_positions[parent_id]
-                x2, y2 = node_positions[child_id]
-                dx, dy = x2 - x1, y2 - y1
-                length = (dx**2 + dy**2)**0.5
-                if length > 0:
-                    shorten_by = 15
-                    if length > 2 * shorten_by:
-                        x1 += dx * shorten_by / length
-                        y1 += dy * shorten_by / length
-                        x2 -= dx * shorten_by / length
-                        y2 -= dy * shorten_by / length
+                x1, y1, x2, y2 = trim_edge(*node_positions[parent_id], *node_positions[child_id])
                 self.canvas.create_line(x1, y1, x2, y2, fill="black", width=2)
 
+        # Loops found by the maze graph join nodes that share a cell
+        for node_a, node_b in self.maze.cross_edges:
+            if node_a in node_positions and node_b in node_positions:
+                x1, y1, x2, y2 = trim_edge(*node_positions[node_a], *node_positions[node_b])
+                self.canvas.create_line(x1, y1, x2, y2, fill="orange", width=2, dash=(4, 2))
+
         for node_id, (x, y) in node_positions.items():
             color = "green" if node_id == self.current_node else "lightblue"
             self.canvas.create_oval(x-15, y-15, x+15, y+15, fill=color, outline="black")
@@ -422,6 +473,8 @@ class LabyrinthVisualizer:
 
         print("[PIPE DEBUG] Setting stop_event and closing pipe")
         stop_event.set()
+        self.ingest.close()
+        self.command_executor.shutdown(wait=False)
 
         # Give the pipe reader thread a moment to close
         print("[PIPE DEBUG] Waiting for reader thread to finish...")
@@ -455,63 +508,36 @@ class LabyrinthVisualizer:
         # Redraw the tree
         self.draw_tree()
 
+    def export_current_view(self):
+        """Export the currently shown view to an SVG or PNG file"""
+        if not self.nodes:
+            messagebox.showwarning("Warning", "No nodes available to export")
+            return
+
+        path = filedialog.asksaveasfilename(
+            parent=self.root,
+            title="Export Map",
+            defaultextension=".svg",
+            filetypes=[("SVG image", "*.svg"), ("PNG image", "*.png")]
+        )
+        if not path:
+            return
+
+        try:
+            export_map(path, self.current_view, self.edges, self.maze, self.current_node)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Failed to export map: {e}")
+            messagebox.showerror("Error", f"Failed to export map: {e}")
+
     def draw_labyrinth(self):
         """Draw a grid showing the robot's complete path from start"""
+        self.current_view = 'labyrinth'
         self.canvas.delete("all")
         if not self.nodes:
             return
 
-        # Movement directions (N=0, E=1, S=2, W=3)
-        directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
-        
-        # Starting position and direction
-        x, y = 0, 0
-        current_dir = 2  # Initial direction (South)
-        visited = {(x, y): 'Start'}  # Cells and their labels
-        path = [(x, y, 'Start')]  # Full path history
-        
-        # Process all nodes to build the path
-        for node_id in sorted(self.nodes.keys(), key=lambda x: len(x)):
-            if node_id == "Rt_":
-                continue
-                
-            # Reset to start for each node's path calculation
-            cx, cy = 0, 0
-            dir = current_dir
-            moves = node_id.split('_')[-1]
-            
-            # Execute each movement in sequence
-            for move in moves:
-                if move == 'F':
-                    dx, dy = directions[dir]
-                    cx += dx
-                    cy += dy
-                elif move == 'R':
-                    dir = (dir + 1) % 4  # Turn right first
-                    dx, dy = directions[dir]
-                    cx += dx
-                    cy += dy
-                elif move == 'L':
-                    dir = (dir - 1) % 4  # Turn left first
-                    dx, dy = directions[dir]
-                    cx += dx
-                    cy += dy
-            
-            # Record final position
-            visited[(cx, cy)] = moves
-            path.append((cx, cy, moves))
-
-        # Calculate grid dimensions
-        all_x = [x for x,y in visited.keys()]
-        all_y = [y for x,y in visited.keys()]
-        min_x, max_x = min(all_x), max(all_x)
-        min_y, max_y = min(all_y), max(all_y)
-        
-        # Add padding
-        min_x -= 1
-        max_x += 1
-        min_y -= 1
-        max_y += 1
+        visited = self.maze.labyrinth_cells()
+        min_x, min_y, max_x, max_y = grid_bounds(visited)
 
         # Calculate drawing parameters
         grid_width = max_x - min_x + 1
@@ -533,10 +559,10 @@ class LabyrinthVisualizer:
                 y2 = y1 + cell_size
                 
                 if (x, y) in visited:
-                    label = visited[(x, y)]
-                    color = "red" if label == "Start" else "lightblue"
+                    labels = visited[(x, y)]
+                    color = cell_color(labels)
                     self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="black")
-                    self.canvas.create_text((x1+x2)//2, (y1+y2)//2, text=label, font=('Arial', 10))
+                    self.canvas.create_text((x1+x2)//2, (y1+y2)//2, text=labels[0], font=('Arial', 10))
                 else:
                     self.canvas.create_rectangle(x1, y1, x2, y2, fill="gray", outline="black")
 
@@ -554,41 +580,24 @@ class LabyrinthVisualizer:
         # First check if pipes exist
         try:
             # Check if command pipe exists
-            check_pipe_cmd = [
-                "ssh",
-                "root@172.16.16.111",
-                "[ -p /root/LegoRobotOutputFile/frontend_sending_command ] && echo exists || echo missing"
-            ]
-            result = subprocess.run(check_pipe_cmd, check=True, capture_output=True, text=True, timeout=5)
-            if "missing" in result.stdout:
+            if not pipe_exists(COMMAND_PIPE):
                 messagebox.showerror("Error", "Command pipe not found on backend")
                 return
 
             # Check if points pipe exists
-            check_points_pipe = [
-                "ssh",
-                "root@172.16.16.111",
-                "[ -p /root/LegoRobotOutputFile/frontend_sending_a_and_b ] && echo exists || echo missing"
-            ]
-            result = subprocess.run(check_points_pipe, check=True, capture_output=True, text=True, timeout=5)
-            if "missing" in result.stdout:
+            if not pipe_exists(POINTS_PIPE):
                 messagebox.showerror("Error", "Points pipe not found on backend")
                 return
 
             # Send 'y' to backend to initiate path selection mode
-            ssh_command = [
-                "ssh",
-                "root@172.16.16.111",
-                "echo 'y' > /root/LegoRobotOutputFile/frontend_sending_command"
-            ]
-            subprocess.run(ssh_command, check=True, timeout=5)
+            send_command('y')
             print("[INFO] Successfully sent 'y' to backend")
 
         except subprocess.TimeoutExpired:
             print("[ERROR] Timeout while checking pipes")
             messagebox.showerror("Error", "Timeout while checking backend pipes")
             return
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, OSError) as e:
             print(f"[ERROR] Failed to check pipes: {e}")
             messagebox.showerror("Error", f"Failed to check backend pipes: {e}")
             return
@@ -606,6 +615,7 @@ class LabyrinthVisualizer:
                                 values=self.node_list)
         point_a_combo.pack(pady=5)
         point_a_combo.current(0)
+        point_a_combo.bind("<<ComboboxSelected>>", self.update_route_info)
         
         ttk.Label(self.dialog, text="Select End Point (B):").pack(pady=(10,0))
         self.point_b_var = tk.StringVar()
@@ -614,9 +624,29 @@ class LabyrinthVisualizer:
         point_b_combo.pack(pady=5)
         if len(self.node_list) > 1:
             point_b_combo.current(1)
+        point_b_combo.bind("<<ComboboxSelected>>", self.update_route_info)
+
+        self.route_label = ttk.Label(self.dialog, text="", justify=tk.LEFT)
+        self.route_label.pack(pady=5)
+        self.update_route_info()
         
         send_button = ttk.Button(self.dialog, text="Send Points", command=self.send_points)
         send_button.pack(pady=20)
+
+    def update_route_info(self, event=None):
+        """Show the shortest known route between the selected points"""
+        point_a = self.point_a_var.get()
+        point_b = self.point_b_var.get()
+        cost, path = self.maze.shortest_route(point_a, point_b)
+        if cost is None:
+            self.route_label.config(text="No known route between these points")
+            return
+
+        tree_cost = self.maze.tree_route_cost(point_a, point_b)
+        text = f"Shortest route: {cost} over {len(path) - 1} steps"
+        if cost < tree_cost:
+            text += f"\nUses a loop, the tree route costs {tree_cost}"
+        self.route_label.config(text=text)
         
 
     def send_points(self):
@@ -633,17 +663,10 @@ class LabyrinthVisualizer:
             
         try:
             # Send the points to the readingPipePathAandB pipe
-            a_and_b_pipe = '/root/LegoRobotOutputFile/frontend_sending_a_and_b'
             command = f"{point_a} {point_b}"
             
-            ssh_command = [
-                "ssh",
-                "root@172.16.16.111",
-                f"echo '{command}' > {a_and_b_pipe}"
-            ]
-            
             # Increase timeout to 10 seconds
-            subprocess.run(ssh_command, check=True, timeout=10)
+            send_command(command, pipe=POINTS_PIPE, timeout=10)
             print(f"[INFO] Successfully sent path from {point_a} to {point_b}")
             
             # Show success message and ask for confirmation
@@ -655,13 +678,7 @@ class LabyrinthVisualizer:
             
             if confirm:
                 # Send 'y' command to start the movement
-                cmd_pipe = '/root/LegoRobotOutputFile/frontend_sending_command'
-                ssh_command = [
-                    "ssh",
-                    "root@172.16.16.111",
-                    f"echo 'y' > {cmd_pipe}"
-                ]
-                subprocess.run(ssh_command, check=True, timeout=5)
+                send_command('y')
                 print("[INFO] Sent 'y' command to start movement")
                 messagebox.showinfo("Success", "Robot movement command sent")
             
@@ -671,56 +688,19 @@ class LabyrinthVisualizer:
             print("[ERROR] Timeout while sending path points")
             messagebox.showerror("Error", 
                 "Timeout while sending points to backend. Is the backend listening?")
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, OSError) as e:
             print(f"[ERROR] Failed to send path points: {e}")
             messagebox.showerror("Error", 
                 f"Failed to send path points. Pipe might not exist.\nError: {e}")
             
-def show_mode_selection():
-    """Show initial mode selection dialog"""
-    root = tk.Tk()
-    root.withdraw()  # Hide the main window
-    
-    # Create mode selection dialog
-    choice = messagebox.askquestion("Mode Selection", 
-                                   "Choose robot operation mode:",
-                                   detail="Yes for Auto mode, No for Manual mode",
-                                   icon='question')
-    
-    mode = 'auto' if choice == 'yes' else 'manual'
-    command = 'a' if choice == 'yes' else 'm'
-    
-    # Send the mode command to backend
-    try:
-        fifo_path = '/root/LegoRobotOutputFile/frontend_sending_command'
-        ssh_command = [
-            "ssh",
-            "root@172.16.16.111",
-            f"echo '{command}' > {fifo_path}"
-        ]
-        subprocess.run(ssh_command, check=True)
-        print(f"[INFO] Successfully sent '{command}' to backend")
-    except subprocess.CalledProcessError as e:
-        print(f"[ERROR] Failed to send mode command: {e}")
-        messagebox.showerror("Error", f"Failed to initialize mode: {e}")
-        root.destroy()
-        return
-    
-    root.destroy()
-    return mode
-
 def main():
-    # Show mode selection first
-    mode = show_mode_selection()
-    if not mode:
-        return  # Exit if mode selection failed
-    
-    # Create main window
+    started_at = time.perf_counter()
+
+    # Create main window, the mode is chosen inside it
     root = tk.Tk()
     root.geometry("1000x700")
     
-    # Create visualizer with selected mode
-    app = LabyrinthVisualizer(root, mode)
+    app = LabyrinthVisualizer(root, started_at=started_at)
     root.protocol("WM_DELETE_WINDOW", app.on_close)
     root.mainloop()
 
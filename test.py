@@ -1,6 +1,14 @@
 # mock_robot.py
+import os
+import sys
 import time
 import json
+import threading
+
+from NodeProtocol import NodeStreamDecoder, NodeStreamEncoder
+from StreamIngest import IngestBuffer
+from MazeGraph import MazeGraph
+from MapExporter import export_map, load_recording
 
 # Sample data that mimics robot output
 test_sequence = [
@@ -11,7 +19,211 @@ test_sequence = [
     {"node_id": "Rt_FLFR", "distance": 40, "possible_ways": {}},
 ]
 
+PIPE_NAMES = ["backend_sending_node_data", "frontend_sending_command", "frontend_sending_a_and_b"]
+
+def echo_commands(path):
+    """Print every line the frontend writes into a command pipe"""
+    while True:
+        with open(path) as pipe:
+            for line in pipe:
+                print(f"[MOCK] {os.path.basename(path)}: {line.strip()}")
+
+def serve_fifos(pipe_dir, delta=False):
+    """Play the sequence into local pipes, run the frontend with
+    LEGO_PIPE_DIR=<pipe_dir> LEGO_TRANSPORT=local to test without ssh"""
+    os.makedirs(pipe_dir, exist_ok=True)
+    for name in PIPE_NAMES:
+        path = os.path.join(pipe_dir, name)
+        if not os.path.exists(path):
+            os.mkfifo(path)
+    for name in PIPE_NAMES[1:]:
+        threading.Thread(target=echo_commands, args=(os.path.join(pipe_dir, name),), daemon=True).start()
+
+    with open(os.path.join(pipe_dir, PIPE_NAMES[0]), "w") as pipe:
+        if delta:
+            # The hello switches the frontend to deltas, then the whole
+            # sequence goes out as one batched delta frame
+            encoder = NodeStreamEncoder()
+            pipe.write(encoder.hello() + "\n")
+            pipe.write(encoder.encode(test_sequence) + "\n")
+            return
+        for data in test_sequence:
+            pipe.write(json.dumps(data) + "\n")
+            pipe.flush()
+            time.sleep(1)  # Simulate delay between commands
+
+# Self-checks for the pure logic modules, run with --self-check or pytest test.py
+def test_delta_round_trip():
+    for compact in (True, False):
+        encoder = NodeStreamEncoder(compact=compact)
+        decoder = NodeStreamDecoder()
+        assert decoder.decode(encoder.hello()) == []
+        sequence = test_sequence + [{"node_id": "Rt_F", "distance": 50, "current_direction": "N"}]
+        decoded = decoder.decode(encoder.encode(sequence))
+        assert [m["node_id"] for m in decoded] == [m["node_id"] for m in sequence]
+        assert [m["distance"] for m in decoded] == [m["distance"] for m in sequence]
+        assert decoded[-1]["current_direction"] == "N"
+
+def test_plain_json_still_decoded():
+    decoder = NodeStreamDecoder()
+    assert decoder.decode(json.dumps(test_sequence[1])) == [test_sequence[1]]
+    assert decoder.decode('{"finishedLabyrinth": "true"}') == [{"finishedLabyrinth": "true"}]
+
+def test_delta_frames_need_hello():
+    decoder = NodeStreamDecoder()
+    for line in ("~0,F,10,S", '{"d": [[0, "F"]]}'):
+        try:
+            decoder.decode(line)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {line!r} before the hello")
+
+def test_malformed_delta_frames_rejected():
+    for line in ('{"d": [1]}', '{"d": 5}', '{"d": [[true, "F"]]}', '{"d": [[0, 7]]}',
+                 "~-1,F", "~9,F", "~a,F", "~0,F,abc", "plain text"):
+        decoder = NodeStreamDecoder()
+        decoder.decode(NodeStreamEncoder().hello())
+        try:
+            decoder.decode(line)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted malformed line {line!r}")
+
+def test_bad_delta_batch_leaves_index_unchanged():
+    decoder = NodeStreamDecoder()
+    decoder.decode(NodeStreamEncoder().hello())
+    for line in ("~0,F,10;1,L,abc", '{"d": [[0, "F"], [1, "L"], [0, 5]]}'):
+        try:
+            decoder.decode(line)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"accepted malformed line {line!r}")
+        assert decoder.node_ids == ["Rt_"] and decoder.node_index == {"Rt_": 0}
+    assert [m["node_id"] for m in decoder.decode("~0,F;1,L;1,L;2,")] == ["Rt_F", "Rt_FL", "Rt_FL", "Rt_FL"]
+    assert decoder.node_ids == ["Rt_", "Rt_F", "Rt_FL"]
+
+def test_ingest_conflates_status():
+    ingest = IngestBuffer()
+    for data in test_sequence:
+        ingest.put(json.dumps(data))
+    for distance in range(100):
+        ingest.put(json.dumps({"node_id": "Rt_F", "distance": distance}))
+    ingest.put('{"finishedLabyrinth": "true"}')
+    ingest.put('x')
+    events, status = ingest.drain()
+    assert [kind for kind, _ in events] == ['node'] * len(test_sequence) + ['finished', 'stop']
+    assert status == ('data', {"node_id": "Rt_F", "distance": 99})
+
+def test_ingest_never_raises_for_bad_lines():
+    ingest = IngestBuffer()
+    ingest.put(NodeStreamEncoder().hello())
+    for line in ('{"d": [1]}', '{"d": 5}', "~-1,F", "[1, 2]", "hello"):
+        ingest.put(line)
+        assert ingest.drain() == ([], ('text', line))
+
+def test_ingest_full_buffer_released_by_stop_event():
+    stop = threading.Event()
+    ingest = IngestBuffer(max_events=1, stop_event=stop)
+    ingest.put(json.dumps(test_sequence[1]))
+    reader = threading.Thread(target=ingest.put, args=(json.dumps(test_sequence[2]),))
+    reader.start()
+    reader.join(0.3)
+    assert reader.is_alive()
+    stop.set()
+    reader.join(1)
+    assert not reader.is_alive()
+
+def test_fifo_reader_delivers_lines_and_bare_x():
+    import tempfile
+    from FileProcessor import read_fifo_forever, write_fifo, stop_event
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pipe = os.path.join(tmp_dir, PIPE_NAMES[0])
+        os.mkfifo(pipe)
+        ingest = IngestBuffer()
+        reader = threading.Thread(target=read_fifo_forever, args=(ingest, pipe), daemon=True)
+        reader.start()
+        try:
+            write_fifo(pipe, json.dumps(test_sequence[0]) + "\n")
+            # The backend recreating its pipe must not strand the reader
+            time.sleep(0.5)
+            os.unlink(pipe)
+            os.mkfifo(pipe)
+            write_fifo(pipe, json.dumps(test_sequence[1]) + "\n")
+            write_fifo(pipe, "x")
+            reader.join(5)
+            assert not reader.is_alive()
+        finally:
+            stop_event.set()
+            reader.join(1)
+            stop_event.clear()
+    events, status = ingest.drain()
+    assert events == [('node', test_sequence[0]), ('node', test_sequence[1]), ('stop', None)]
+
+# Starting south, F L L L drives around one block back into the start cell
+loop_sequence = [("Rt_", 0), ("Rt_F", 10), ("Rt_FL", 20), ("Rt_FLL", 30), ("Rt_FLLL", 40), ("Rt_FLLLF", 50)]
+
+def test_maze_loop_gives_shorter_route():
+    maze = MazeGraph()
+    revisits = [maze.add_node(node_id, distance) for node_id, distance in loop_sequence]
+    assert revisits == [None, None, None, None, "Rt_", None]
+    assert maze.cross_edges == [("Rt_", "Rt_FLLL")]
+    assert maze.shortest_route("Rt_FLLLF", "Rt_") == (10, ["Rt_FLLLF", "Rt_FLLL", "Rt_"])
+    assert maze.tree_route_cost("Rt_FLLLF", "Rt_") == 50
+    assert maze.shortest_route("Rt_", "Rt_missing") == (None, [])
+
+def test_exports_keep_loop_edges():
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        recording = os.path.join(tmp_dir, "run.txt")
+        with open(recording, "w") as f:
+            for node_id, distance in loop_sequence:
+                f.write(json.dumps({"node_id": node_id, "distance": distance}) + "\n")
+        nodes, edges, maze, current_node = load_recording(recording)
+        assert maze.cross_edges == [("Rt_", "Rt_FLLL")]
+        assert maze.labyrinth_cells()[(0, 0)] == ["Start", "FLLL"]
+
+        svg = os.path.join(tmp_dir, "tree.svg")
+        export_map(svg, "tree", edges, maze, current_node)
+        with open(svg) as f:
+            assert 'stroke="orange"' in f.read()
+        for view in ("tree", "labyrinth"):
+            png = os.path.join(tmp_dir, f"{view}.png")
+            export_map(png, view, edges, maze, current_node)
+            with open(png, "rb") as f:
+                assert f.read(8) == b"\x89PNG\r\n\x1a\n"
+
+def test_tree_png_with_many_loops_is_fast():
+    import tempfile
+    # Circling the same block 1500 times revisits a cell with almost every node
+    maze = MazeGraph()
+    edges = []
+    for i in range(1, 6000):
+        node_id = "Rt_" + ("FLLL" * 1500)[:i]
+        edges.append((node_id[:-1] if i > 1 else "Rt_", node_id))
+        maze.add_node(node_id)
+    assert len(maze.cross_edges) > 5000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        started = time.perf_counter()
+        export_map(os.path.join(tmp_dir, "tree.png"), "tree", edges, maze)
+        assert time.perf_counter() - started < 3
+
+def self_check():
+    checks = [value for name, value in sorted(globals().items()) if name.startswith("test_") and callable(value)]
+    for check in checks:
+        check()
+        print(f"[OK] {check.__name__}")
+    print(f"[OK] {len(checks)} checks passed")
+
 if __name__ == "__main__":
+    if "--self-check" in sys.argv[1:]:
+        self_check()
+        sys.exit(0)
+
+    if len(sys.argv) > 2 and sys.argv[1] == "--fifo":
+        serve_fifos(sys.argv[2], delta="--delta" in sys.argv[3:])
+        sys.exit(0)
+
     for data in test_sequence:
         print(json.dumps(data))  # Prints JSON to stdout
         time.sleep(1)  # Simulate delay between commands